@@ -5,23 +5,29 @@ from scripts.dungeon_generation import BSPAlgorithm
 from scripts.textures import GameSprites
 from scripts.renderer import Renderer
 from scripts.game_logic import GameLogic
+from scripts.lighting import Lighting
+from scripts.turn_history import TurnHistory
+from scripts.parallel_turns import ParallelTurnEngine
 
 
 SCREEN_SIZE: tuple[int, int] = (15, 9) # The size of the screen, in game tiles. Both numbers should be odd
 TILE_SIZE: int = 64 # The side length, in pixels, of each game tile rendered on screen
 DUNGEON_SIZE: tuple[int, int] = 100, 75 # The size, in tiles, of the game's dungeon
 RANDOM_SEED: int = int(time.time()) # The random seed used to generate the dungeon
+PLAYER_LIGHT_RADIUS: float = 4.5 # The radius, in tiles, of the light carried by the player
+HISTORY_SIZE: int = 256 # The number of turns that can be undone
+PARALLEL_WORKERS: int = 0 # The number of processes moving the enemies, 0 to move them in the main process
 
 pygame.init()
 screen = pygame.display.set_mode((SCREEN_SIZE[0] * TILE_SIZE, SCREEN_SIZE[1] * TILE_SIZE))
 clock = pygame.time.Clock()
 running = True
 
-WALL_VMATRIX = GameSprites.variant_matrix(size=DUNGEON_SIZE, variants=GameSprites.tiles.WALL.variants, random_seed=RANDOM_SEED)
-ROOM_VMATRIX = GameSprites.variant_matrix(size=DUNGEON_SIZE, variants=GameSprites.tiles.ROOM.variants, random_seed=RANDOM_SEED + 1)
-CORRIDOR_VMATRIX = GameSprites.variant_matrix(size=DUNGEON_SIZE, variants=GameSprites.tiles.CORRIDOR.variants, random_seed=RANDOM_SEED + 2)
-OBSTACLES_VMATRIX = GameSprites.object_variant_matrix(size=DUNGEON_SIZE, object_textures=[GameSprites.tiles.CRATE], random_seed=RANDOM_SEED + 3)
-DECORATION_VMATRIX = GameSprites.object_variant_matrix(size=DUNGEON_SIZE, object_textures=[GameSprites.tiles.BONES], random_seed=RANDOM_SEED + 4, fill=.02)
+WALL_VMATRIX = GameSprites.variant_layer(variants=GameSprites.tiles.WALL.variants, random_seed=RANDOM_SEED, layer=0)
+ROOM_VMATRIX = GameSprites.variant_layer(variants=GameSprites.tiles.ROOM.variants, random_seed=RANDOM_SEED, layer=1)
+CORRIDOR_VMATRIX = GameSprites.variant_layer(variants=GameSprites.tiles.CORRIDOR.variants, random_seed=RANDOM_SEED, layer=2)
+OBSTACLES_VMATRIX = GameSprites.object_variant_layer(object_textures=[GameSprites.tiles.CRATE], random_seed=RANDOM_SEED, layer=3)
+DECORATION_VMATRIX = GameSprites.object_variant_layer(object_textures=[GameSprites.tiles.BONES], random_seed=RANDOM_SEED, layer=4, fill=.02)
 
 NEW_TURN_EVENT = pygame.USEREVENT + 1
 
@@ -31,12 +37,15 @@ DUNGEON_GRID, ROOMS = BSPAlgorithm.generate(
     corridor_width=3,
     random_seed=RANDOM_SEED
 )
+LIGHT_SOURCES = Lighting.place_torches(rooms=ROOMS, random_seed=RANDOM_SEED + 7)
 
 init_config = {
     "screen": screen,
     "screen_size": SCREEN_SIZE,
     "tile_size": TILE_SIZE,
     "dungeon_grid": DUNGEON_GRID,
+    "rooms": ROOMS,
+    "light_sources": LIGHT_SOURCES,
     "wall_vmatrix": WALL_VMATRIX,
     "room_vmatrix": ROOM_VMATRIX,
     "corridor_vmatrix": CORRIDOR_VMATRIX,
@@ -45,6 +54,7 @@ init_config = {
     "new_turn_event": NEW_TURN_EVENT
 }
 Renderer.init(**init_config)
+Lighting.init(**init_config)
 PLAYER, ENEMIES = GameLogic.init(**init_config)
 
 # Compute the area of all rooms to find the smallest one and the greatest one
@@ -55,6 +65,15 @@ spawn_coords, exit_coords = (spawn_room[0] + spawn_room[2]//2, spawn_room[1] + s
 PLAYER.position = spawn_coords
 GameLogic.instantiate_enemies(amount=50, random_seed=RANDOM_SEED + 5)
 
+if PARALLEL_WORKERS > 0:
+    ParallelTurnEngine.init(**init_config, enemies=ENEMIES, workers=PARALLEL_WORKERS)
+    process_enemy_movements = ParallelTurnEngine.process_enemy_movements
+else:
+    process_enemy_movements = GameLogic.process_enemy_movements
+
+TurnHistory.init(capacity=HISTORY_SIZE)
+TurnHistory.record(turn=GameLogic.turn)
+
 while running:
 
     for event in pygame.event.get():
@@ -66,17 +85,23 @@ while running:
             if event.key == pygame.K_d: PLAYER.move_right()
             if event.key == pygame.K_z: PLAYER.move_up()
             if event.key == pygame.K_s: PLAYER.move_down()
+            if event.key == pygame.K_r: TurnHistory.undo()
         
         if event.type == NEW_TURN_EVENT:
-            GameLogic.process_enemy_movements(enemies=ENEMIES, random_seed=RANDOM_SEED + 6)
+            process_enemy_movements(enemies=ENEMIES, random_seed=RANDOM_SEED + 6)
+            TurnHistory.record(turn=GameLogic.turn)
 
 
     screen.fill((0, 0, 0))
 
-    Renderer.render_scene(player_position=PLAYER.position)
+    Renderer.render_scene(
+        player_position=PLAYER.position,
+        dynamic_lights=[Lighting.LightSource(position=PLAYER.position, radius=PLAYER_LIGHT_RADIUS)]
+    )
     Renderer.render_ui(player=PLAYER)
     
     pygame.display.flip()
     clock.tick(60)
 
+ParallelTurnEngine.close()
 pygame.quit()
\ No newline at end of file
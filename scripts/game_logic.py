@@ -2,14 +2,14 @@ import pygame
 import random
 import numpy as np
 
-from scripts.textures import GameSprites
+from scripts.textures import GameSprites, _VariantLayer, _ObjectVariantLayer
 
 class GameLogic:
     DUNGEON_GRID: np.ndarray
-    WALL_VMATRIX: np.ndarray
-    ROOM_VMATRIX: np.ndarray
-    CORRIDOR_VMATRIX: np.ndarray
-    OBSTACLES_VMATRIX: np.ndarray
+    WALL_VMATRIX: _VariantLayer
+    ROOM_VMATRIX: _VariantLayer
+    CORRIDOR_VMATRIX: _VariantLayer
+    OBSTACLES_VMATRIX: _ObjectVariantLayer
     NEW_TURN_EVENT: int
 
     ENEMIES: 'list[GameLogic.Enemy]'
@@ -19,10 +19,10 @@ class GameLogic:
 
     @classmethod
     def init(cls, dungeon_grid: np.ndarray,
-             wall_vmatrix: np.ndarray,
-             room_vmatrix: np.ndarray,
-             corridor_vmatrix: np.ndarray,
-             obstacles_vmatrix: np.ndarray,
+             wall_vmatrix: _VariantLayer,
+             room_vmatrix: _VariantLayer,
+             corridor_vmatrix: _VariantLayer,
+             obstacles_vmatrix: _ObjectVariantLayer,
              new_turn_event: int,
              *args, **kwargs) -> tuple:
         cls.DUNGEON_GRID = dungeon_grid
@@ -0,0 +1,244 @@
+import math
+import random
+import pygame
+import numpy as np
+
+
+class Lighting:
+    DUNGEON_GRID: np.ndarray
+    ROOMS: list[tuple[int, int, int, int]]
+    LIGHT_MAP: np.ndarray
+    LIGHT_MAP_PADDING: int
+    TILE_SIZE: int
+    LIGHT_SOURCES: 'list[Lighting.LightSource]'
+
+    AMBIENT_LIGHT: float = .15 # The light level of every room tile that no light source reaches
+    CORRIDOR_LIGHT: float = .35 # The light level of corridor tiles and of the walls surrounding them
+    CHUNK_SIZE: int = 8 # The side length, in tiles, of each baked light chunk
+    CHUNK_CACHE_SIZE: int = 48 # The maximum number of baked light chunks kept in memory
+
+    _chunk_cache: dict[tuple[int, int], pygame.Surface] = {}
+
+
+    class LightSource:
+        def __init__(self, position: tuple[int, int], radius: float, intensity: float = 1.) -> None:
+            self.position = position
+            self.radius = radius
+            self.intensity = intensity
+        def __repr__(self) -> str:
+            return f'LightSource({self.position}, radius={self.radius}, intensity={self.intensity})'
+
+
+    @classmethod
+    def init(cls, screen_size: tuple[int, int],
+             tile_size: int,
+             dungeon_grid: np.ndarray,
+             rooms: list[tuple[int, int, int, int]],
+             light_sources: 'list[Lighting.LightSource]',
+             *args, **kwargs) -> None:
+        '''Initializes the lighting subsystem and bakes the static light map of the dungeon.
+
+        :param tuple[int, int] screen_size: The size of the screen, in game tiles.
+        :param int tile_size: The size of each tile in pixels.
+        :param np.ndarray dungeon_grid: The grid representing the dungeon layout.
+        :param list[tuple[int, int, int, int]] rooms: The rectangles of the rooms, as returned by BSPAlgorithm.generate.
+        :param list[Lighting.LightSource] light_sources: The static light sources of the dungeon.
+        :return: None
+        '''
+        cls.TILE_SIZE = tile_size
+        cls.LIGHT_MAP_PADDING = max(screen_size)
+        cls.DUNGEON_GRID = dungeon_grid
+        cls.ROOMS = rooms
+        cls.bake(light_sources)
+
+
+    @classmethod
+    def place_torches(cls, rooms: list[tuple[int, int, int, int]], random_seed: int, intensity: float = 1.) -> 'list[Lighting.LightSource]':
+        '''Places one torch at a random position inside each room.
+
+        The radius of each torch is half the diagonal of its room, so that the whole room receives some light.
+
+        :param list[tuple[int, int, int, int]] rooms: The rectangles of the rooms, as returned by BSPAlgorithm.generate.
+        :param int random_seed: The seed for the random number generator.
+        :param float intensity: The light level at the position of each torch, defaults to 1.
+        :return list[Lighting.LightSource]: The torches, one per room.
+        '''
+        random.seed(random_seed)
+        torches = []
+        for x, y, w, h in rooms:
+            position = (random.randint(x, x + w - 1), random.randint(y, y + h - 1))
+            torches.append(cls.LightSource(position=position, radius=max(3, math.hypot(w, h) / 2), intensity=intensity))
+        return torches
+
+
+    @classmethod
+    def bake(cls, light_sources: 'list[Lighting.LightSource]') -> None:
+        '''(Re)computes the static light map from the given light sources and empties the chunk cache.
+
+        :param list[Lighting.LightSource] light_sources: The static light sources of the dungeon.
+        :return: None
+        '''
+        cls.LIGHT_SOURCES = light_sources
+        light_map = cls.static_light_map(dungeon_grid=cls.DUNGEON_GRID, rooms=cls.ROOMS, light_sources=light_sources)
+        cls.LIGHT_MAP = np.pad(light_map, (cls.LIGHT_MAP_PADDING,), mode='constant', constant_values=0)
+        cls._chunk_cache.clear()
+
+
+    @classmethod
+    def static_light_map(cls, dungeon_grid: np.ndarray,
+                         rooms: list[tuple[int, int, int, int]],
+                         light_sources: 'list[Lighting.LightSource]') -> np.ndarray:
+        '''Computes the light level of every tile of the dungeon, from 0 (pitch black) to 1 (fully lit).
+
+        Room tiles receive the ambient light, corridors and their walls receive the corridor light.
+        A light source placed inside a room only lights that room and the walls surrounding it,
+        any other light source lights every tile within its radius.
+
+        :param np.ndarray dungeon_grid: The grid representing the dungeon layout.
+        :param list[tuple[int, int, int, int]] rooms: The rectangles of the rooms, as returned by BSPAlgorithm.generate.
+        :param list[Lighting.LightSource] light_sources: The static light sources of the dungeon.
+        :return np.ndarray: A float matrix of the same shape as dungeon_grid.
+        '''
+        corridors = dungeon_grid == 2
+        corridors_and_walls = corridors.copy()
+        corridors_and_walls[1:, :] |= corridors[:-1, :]
+        corridors_and_walls[:-1, :] |= corridors[1:, :]
+        corridors_and_walls[:, 1:] |= corridors[:, :-1]
+        corridors_and_walls[:, :-1] |= corridors[:, 1:]
+
+        light_map = np.zeros(shape=dungeon_grid.shape, dtype=float)
+        light_map[dungeon_grid == 1] = cls.AMBIENT_LIGHT
+        light_map[corridors_and_walls] = np.maximum(light_map[corridors_and_walls], cls.CORRIDOR_LIGHT)
+
+        for source in light_sources:
+            r = math.ceil(source.radius)
+            x0, x1 = source.position[0] - r, source.position[0] + r + 1
+            y0, y1 = source.position[1] - r, source.position[1] + r + 1
+            for x, y, w, h in rooms:
+                if x <= source.position[0] < x + w and y <= source.position[1] < y + h:
+                    x0, x1 = max(x0, x - 1), min(x1, x + w + 1)
+                    y0, y1 = max(y0, y - 1), min(y1, y + h + 1)
+                    break
+            x0, x1 = max(x0, 0), min(x1, dungeon_grid.shape[0])
+            y0, y1 = max(y0, 0), min(y1, dungeon_grid.shape[1])
+            light_map[x0:x1, y0:y1] += cls._falloff(source, *np.ogrid[x0:x1, y0:y1])
+
+        return np.minimum(light_map, 1.)
+
+
+    @classmethod
+    def _falloff(cls, source: 'Lighting.LightSource', xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        '''Computes the light that a source casts on the given tiles, decreasing linearly down to 0 at its radius.
+
+        :param Lighting.LightSource source: The light source.
+        :param np.ndarray xs: The x-coordinates of the tiles, as a column (see numpy.ogrid).
+        :param np.ndarray ys: The y-coordinates of the tiles, as a row (see numpy.ogrid).
+        :return np.ndarray: The light received by each tile.
+        '''
+        distance = np.hypot(xs - source.position[0], ys - source.position[1])
+        return source.intensity * np.clip(1 - distance / source.radius, 0, 1)
+
+
+    @classmethod
+    def render(cls, screen: pygame.Surface, splitter: tuple, dynamic_lights: 'list[Lighting.LightSource]' = None) -> None:
+        '''Darkens the rendered scene according to the static light map and the dynamic light sources.
+
+        Tiles that no dynamic light reaches are covered by baked chunks of the static light map, which are cached
+        between frames. The light levels of the area reached by dynamic lights are computed for this frame only.
+
+        :param pygame.Surface screen: The screen surface on which the scene has been rendered.
+        :param tuple splitter: The tuple defining the visible area of the padded dungeon grid (See Renderer.render_scene).
+        :param list[Lighting.LightSource] dynamic_lights: The light sources that can move, in dungeon coordinates, defaults to None.
+        :return: None
+        '''
+        view = pygame.Rect(splitter[0], splitter[2], splitter[1] - splitter[0], splitter[3] - splitter[2])
+
+        dynamic_area = pygame.Rect(0, 0, 0, 0)
+        for source in dynamic_lights or []:
+            r = math.ceil(source.radius)
+            area = pygame.Rect(
+                source.position[0] + cls.LIGHT_MAP_PADDING - r, source.position[1] + cls.LIGHT_MAP_PADDING - r, 2*r + 1, 2*r + 1
+            ).clip(view)
+            if area.width > 0 and area.height > 0:
+                dynamic_area = area if dynamic_area.width == 0 else dynamic_area.union(area)
+
+        static_areas = [view] if dynamic_area.width == 0 else cls._subtract(view, dynamic_area)
+        for area in static_areas:
+            screen.set_clip(cls._to_screen(area, splitter))
+            for cx in range(area.left // cls.CHUNK_SIZE, (area.right - 1) // cls.CHUNK_SIZE + 1):
+                for cy in range(area.top // cls.CHUNK_SIZE, (area.bottom - 1) // cls.CHUNK_SIZE + 1):
+                    screen.blit(
+                        cls._chunk_surface(cx, cy),
+                        ((cx * cls.CHUNK_SIZE - splitter[0]) * cls.TILE_SIZE, (cy * cls.CHUNK_SIZE - splitter[2]) * cls.TILE_SIZE),
+                        special_flags=pygame.BLEND_RGB_MULT
+                    )
+        screen.set_clip(None)
+
+        if dynamic_area.width > 0:
+            light = cls.LIGHT_MAP[dynamic_area.left:dynamic_area.right, dynamic_area.top:dynamic_area.bottom].copy()
+            xs, ys = np.ogrid[dynamic_area.left:dynamic_area.right, dynamic_area.top:dynamic_area.bottom]
+            for source in dynamic_lights:
+                light += cls._falloff(source, xs - cls.LIGHT_MAP_PADDING, ys - cls.LIGHT_MAP_PADDING)
+            screen.blit(cls._light_surface(np.minimum(light, 1.)), cls._to_screen(dynamic_area, splitter), special_flags=pygame.BLEND_RGB_MULT)
+
+
+    @classmethod
+    def _chunk_surface(cls, cx: int, cy: int) -> pygame.Surface:
+        '''Returns the baked surface of a chunk of the static light map, baking it if it is not cached.
+
+        :param int cx: The x-coordinate of the chunk, in chunks of the padded light map.
+        :param int cy: The y-coordinate of the chunk, in chunks of the padded light map.
+        :return pygame.Surface: The light levels of the chunk, as shades of grey scaled to the tile size.
+        '''
+        surface = cls._chunk_cache.get((cx, cy))
+        if surface is None:
+            if len(cls._chunk_cache) >= cls.CHUNK_CACHE_SIZE:
+                del cls._chunk_cache[next(iter(cls._chunk_cache))]
+            surface = cls._light_surface(cls.LIGHT_MAP[
+                cx * cls.CHUNK_SIZE:(cx+1) * cls.CHUNK_SIZE, cy * cls.CHUNK_SIZE:(cy+1) * cls.CHUNK_SIZE
+            ])
+            cls._chunk_cache[(cx, cy)] = surface
+        return surface
+
+
+    @classmethod
+    def _light_surface(cls, light: np.ndarray) -> pygame.Surface:
+        '''Converts a matrix of light levels into a surface meant to be blitted with the BLEND_RGB_MULT flag.
+
+        :param np.ndarray light: The light level of each tile, from 0 to 1.
+        :return pygame.Surface: A surface in which each tile is a shade of grey, scaled to the tile size.
+        '''
+        shades = np.repeat((light * 255).astype(np.uint8)[:, :, np.newaxis], 3, axis=2)
+        surface = pygame.surfarray.make_surface(shades)
+        return pygame.transform.scale(surface, (light.shape[0] * cls.TILE_SIZE, light.shape[1] * cls.TILE_SIZE))
+
+
+    @classmethod
+    def _subtract(cls, outer: pygame.Rect, inner: pygame.Rect) -> list[pygame.Rect]:
+        '''Splits the part of a rectangle that lies outside of another rectangle it contains into up to four rectangles.
+
+        :param pygame.Rect outer: The rectangle to split.
+        :param pygame.Rect inner: The rectangle to remove, contained in outer.
+        :return list[pygame.Rect]: The non-empty rectangles covering outer without inner.
+        '''
+        rects = [
+            pygame.Rect(outer.left, outer.top, outer.width, inner.top - outer.top),
+            pygame.Rect(outer.left, inner.bottom, outer.width, outer.bottom - inner.bottom),
+            pygame.Rect(outer.left, inner.top, inner.left - outer.left, inner.height),
+            pygame.Rect(inner.right, inner.top, outer.right - inner.right, inner.height)
+        ]
+        return [rect for rect in rects if rect.width > 0 and rect.height > 0]
+
+
+    @classmethod
+    def _to_screen(cls, area: pygame.Rect, splitter: tuple) -> pygame.Rect:
+        '''Converts an area of the padded light map into the matching area of the screen, in pixels.
+
+        :param pygame.Rect area: The area, in tiles of the padded light map.
+        :param tuple splitter: The tuple defining the visible area of the padded dungeon grid.
+        :return pygame.Rect: The area, in pixels of the screen.
+        '''
+        return pygame.Rect(
+            (area.left - splitter[0]) * cls.TILE_SIZE, (area.top - splitter[2]) * cls.TILE_SIZE,
+            area.width * cls.TILE_SIZE, area.height * cls.TILE_SIZE
+        )
@@ -0,0 +1,256 @@
+import os
+import time
+import signal
+import itertools
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+
+from scripts.textures import _splitmix64, _MASK_64, _GOLDEN_RATIO_64, _ObjectVariantLayer
+from scripts.game_logic import GameLogic
+
+
+_DIRECTION_ORDERS = list(itertools.permutations([(1, 0), (-1, 0), (0, 1), (0, -1)]))
+
+_worker_state: dict = {} # The shared arrays attached by each worker process (See _init_worker)
+
+
+def _attach(name: str, shape: tuple, dtype: type) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape=shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(walkable_name: str, positions_name: str, dungeon_size: tuple[int, int], enemies: int, region_size: int) -> None:
+    '''Attaches a worker process to the shared walkable mask and positions array.'''
+    # Workers are forked from a process in which pygame catches SIGTERM, which would prevent Pool.terminate from stopping them
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _worker_state['walkable'] = _attach(walkable_name, dungeon_size, np.bool_)
+    _worker_state['positions'] = _attach(positions_name, (enemies, 2), np.int32)
+    _worker_state['region_size'] = region_size
+
+
+def _move_enemies(turn: int, random_seed: int, player_position: tuple[int, int], indices: np.ndarray) -> list[tuple[int, int, int]]:
+    '''Moves the given enemies within their regions, and returns the moves that would make them leave their regions.
+
+    Enemies are moved one after the other, in the order of indices, each one trying the four directions in an order
+    that only depends on (random_seed, turn, enemy index). An enemy moves to the first free tile of its region,
+    or stops at the first walkable tile outside of its region, which is returned as a proposal.
+
+    :param int turn: The number of the turn.
+    :param int random_seed: The seed of the movements.
+    :param tuple[int, int] player_position: The position of the player, which no enemy can move to.
+    :param np.ndarray indices: The indices of the enemies to move, sorted by region then by index.
+    :return list[tuple[int, int, int]]: The proposed cross-border moves, as (enemy index, x-position, y-position).
+    '''
+    walkable = _worker_state['walkable'][1]
+    positions = _worker_state['positions'][1]
+    region_size = _worker_state['region_size']
+
+    starting_positions = positions[indices].tolist()
+    occupied = set(map(tuple, starting_positions)) | {tuple(player_position)}
+    turn_hash = _splitmix64((random_seed * _GOLDEN_RATIO_64 + turn) & _MASK_64)
+
+    new_positions = []
+    proposals = []
+    for i, (x, y) in zip(indices.tolist(), starting_positions):
+        region = (x // region_size, y // region_size)
+        for dx, dy in _DIRECTION_ORDERS[_splitmix64((turn_hash ^ i) * _GOLDEN_RATIO_64 & _MASK_64) % len(_DIRECTION_ORDERS)]:
+            tx, ty = x + dx, y + dy
+            if not (0 <= tx < walkable.shape[0] and 0 <= ty < walkable.shape[1]) or not walkable[tx, ty]:
+                continue
+            if (tx // region_size, ty // region_size) != region:
+                proposals.append((i, tx, ty))
+                break
+            if (tx, ty) not in occupied:
+                occupied.discard((x, y))
+                occupied.add((tx, ty))
+                x, y = tx, ty
+                break
+        new_positions.append((x, y))
+
+    if len(new_positions) > 0:
+        positions[indices] = new_positions
+    return proposals
+
+
+class ParallelTurnEngine:
+    DUNGEON_GRID: np.ndarray
+    WORKERS: int
+    REGION_SIZE: int
+
+    _walkable: tuple[shared_memory.SharedMemory, np.ndarray] = None
+    _positions: tuple[shared_memory.SharedMemory, np.ndarray] = None
+    _occupancy: np.ndarray
+    _pool: 'multiprocessing.pool.Pool' = None
+
+
+    @classmethod
+    def init(cls, dungeon_grid: np.ndarray,
+             obstacles_vmatrix: _ObjectVariantLayer,
+             enemies: 'list[GameLogic.Enemy]',
+             workers: int = None,
+             region_size: int = 16,
+             *args, **kwargs) -> None:
+        '''Starts the worker processes and shares the walkable tiles of the dungeon and the positions of the enemies with them.
+
+        The dungeon is split into square regions, whose enemies are moved by the worker processes. As the regions
+        never change, the enemies move the same way whatever the number of workers.
+        The worker processes are forked from the current one, which is only possible on platforms supporting the fork start method.
+
+        :param np.ndarray dungeon_grid: The grid representing the dungeon layout.
+        :param _ObjectVariantLayer obstacles_vmatrix: The variant layer of the obstacles.
+        :param list[GameLogic.Enemy] enemies: The enemies that will be moved, whose number must not change.
+        :param int workers: The number of worker processes, defaults to None (one per CPU core).
+        :param int region_size: The side length, in tiles, of each region, defaults to 16.
+        :return: None
+        '''
+        cls.close()
+        cls.DUNGEON_GRID = dungeon_grid
+        cls.REGION_SIZE = region_size
+        cls.WORKERS = workers or os.cpu_count()
+
+        obstacles = obstacles_vmatrix[0:dungeon_grid.shape[0], 0:dungeon_grid.shape[1]][:, :, 0] != None
+        cls._walkable = cls._allocate(dungeon_grid.shape, np.bool_)
+        cls._walkable[1][:] = (dungeon_grid != 0) & ~((dungeon_grid == 1) & obstacles)
+        cls._positions = cls._allocate((len(enemies), 2), np.int32)
+        cls._occupancy = np.zeros(shape=dungeon_grid.shape, dtype=np.bool_)
+        cls._start_pool()
+
+
+    @classmethod
+    def _allocate(cls, shape: tuple, dtype: type) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+        return shm, np.ndarray(shape=shape, dtype=dtype, buffer=shm.buf)
+
+
+    @classmethod
+    def _start_pool(cls) -> None:
+        if cls._pool is not None:
+            cls._pool.terminate()
+        cls._pool = multiprocessing.get_context('fork').Pool(
+            processes=cls.WORKERS,
+            initializer=_init_worker,
+            initargs=(cls._walkable[0].name, cls._positions[0].name, cls.DUNGEON_GRID.shape, len(cls._positions[1]), cls.REGION_SIZE)
+        )
+
+
+    @classmethod
+    def close(cls) -> None:
+        '''Stops the worker processes and frees the shared memory.
+
+        :return: None
+        '''
+        if cls._pool is not None:
+            cls._pool.terminate()
+            cls._pool = None
+        # The arrays must be released before the shared memory they are built on can be closed
+        shms = [shared[0] for shared in [cls._walkable, cls._positions] if shared is not None]
+        cls._walkable = cls._positions = None
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+    @classmethod
+    def _batches(cls, positions: np.ndarray) -> list[np.ndarray]:
+        '''Sorts the enemies by region, and splits them into one batch per worker without splitting any region.
+
+        :param np.ndarray positions: The positions of the enemies.
+        :return list[np.ndarray]: The indices of the enemies of each batch.
+        '''
+        regions_y = -(-cls.DUNGEON_GRID.shape[1] // cls.REGION_SIZE)
+        regions = (positions[:, 0] // cls.REGION_SIZE) * regions_y + positions[:, 1] // cls.REGION_SIZE
+        order = np.argsort(regions, kind='stable')
+        region_starts = np.flatnonzero(np.diff(regions[order], prepend=-1))
+
+        targets = np.arange(1, cls.WORKERS) * len(order) // cls.WORKERS
+        cuts = np.unique(region_starts[np.minimum(np.searchsorted(region_starts, targets), len(region_starts) - 1)])
+        return [batch for batch in np.split(order, cuts) if len(batch) > 0]
+
+
+    @classmethod
+    def process_enemy_movements(cls, enemies: 'list[GameLogic.Enemy]', random_seed: int) -> None:
+        '''Processes the movements of a list of enemies in the worker processes.
+
+        Each worker moves the enemies of its regions, then the moves across region borders are resolved
+        in the order of the enemy indices: an enemy crosses the border if its destination is still free.
+
+        :param list[GameLogic.Enemy] enemies: The list of Enemy objects given to ParallelTurnEngine.init.
+        :param int random_seed: A seed value used to influence the randomness of enemy movements.
+        :raises ValueError: If the number of enemies changed since ParallelTurnEngine.init was called.
+        :return: None
+        '''
+        positions = cls._positions[1]
+        if len(enemies) != len(positions):
+            raise ValueError(f'The engine was initialized with {len(positions)} enemies, not {len(enemies)}')
+        if len(enemies) == 0:
+            return
+
+        positions[:] = [e.position for e in enemies]
+        previous_positions = positions.copy()
+        player_position = tuple(GameLogic.PLAYER.position)
+
+        proposals = cls._pool.starmap(
+            _move_enemies,
+            [(GameLogic.turn, random_seed, player_position, batch) for batch in cls._batches(positions)]
+        )
+
+        occupancy = cls._occupancy
+        occupancy[:] = False
+        occupancy[positions[:, 0], positions[:, 1]] = True
+        occupancy[player_position] = True
+        for i, x, y in sorted(itertools.chain.from_iterable(proposals)):
+            if not occupancy[x, y]:
+                occupancy[tuple(positions[i])] = False
+                occupancy[x, y] = True
+                positions[i] = (x, y)
+
+        for i in np.flatnonzero(np.any(positions != previous_positions, axis=1)).tolist():
+            enemies[i].position = (int(positions[i, 0]), int(positions[i, 1]))
+
+
+    @classmethod
+    def benchmark(cls, enemies: 'list[GameLogic.Enemy]', random_seed: int, turns: int = 10, max_workers: int = None) -> dict[int, dict[str, float]]:
+        '''Measures how the engine scales from 1 to max_workers worker processes.
+
+        The same turns are played from the same positions with each number of workers, after which the enemies
+        are put back where they were and the engine goes back to its own number of workers.
+
+        :param list[GameLogic.Enemy] enemies: The list of Enemy objects given to ParallelTurnEngine.init.
+        :param int random_seed: A seed value used to influence the randomness of enemy movements.
+        :param int turns: The number of turns played with each number of workers, defaults to 10.
+        :param int max_workers: The greatest number of workers, defaults to None (one per CPU core).
+        :raises RuntimeError: If the enemies did not end at the same positions with every number of workers.
+        :return dict[int, dict[str, float]]: For each number of workers, the 'seconds_per_turn', the 'speedup'
+            compared to a single worker, and the scaling 'efficiency' (speedup divided by the number of workers).
+        '''
+        workers, turn = cls.WORKERS, GameLogic.turn
+        starting_positions = [e.position for e in enemies]
+        results = {}
+        final_positions = None
+        try:
+            for w in range(1, (max_workers or os.cpu_count()) + 1):
+                cls.WORKERS = w
+                cls._start_pool()
+                for e, position in zip(enemies, starting_positions):
+                    e.position = position
+
+                start = time.perf_counter()
+                for t in range(turns):
+                    GameLogic.turn = turn + t
+                    cls.process_enemy_movements(enemies=enemies, random_seed=random_seed)
+                seconds_per_turn = (time.perf_counter() - start) / turns
+
+                if final_positions is None:
+                    final_positions = [e.position for e in enemies]
+                elif final_positions != [e.position for e in enemies]:
+                    raise RuntimeError(f'The enemies moved differently with {w} workers than with 1 worker')
+
+                speedup = results[1]['seconds_per_turn'] / seconds_per_turn if w > 1 else 1.
+                results[w] = {'seconds_per_turn': seconds_per_turn, 'speedup': speedup, 'efficiency': speedup / w}
+        finally:
+            for e, position in zip(enemies, starting_positions):
+                e.position = position
+            cls.WORKERS, GameLogic.turn = workers, turn
+            cls._start_pool()
+        return results
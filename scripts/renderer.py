@@ -1,8 +1,9 @@
 import pygame
 import numpy as np
 
-from scripts.textures import GameSprites
+from scripts.textures import GameSprites, _VariantLayer, _ObjectVariantLayer
 from scripts.game_logic import GameLogic
+from scripts.lighting import Lighting
 
 
 class Renderer:
@@ -10,11 +11,11 @@ class Renderer:
     SCREEN_SIZE: tuple[int, int]
     TILE_SIZE: int
     DUNGEON_GRID: np.ndarray
-    WALL_VMATRIX: np.ndarray
-    ROOM_VMATRIX: np.ndarray
-    CORRIDOR_VMATRIX: np.ndarray
-    OBSTACLES_VMATRIX: np.ndarray
-    DECORATION_VMATRIX: np.ndarray
+    WALL_VMATRIX: _VariantLayer
+    ROOM_VMATRIX: _VariantLayer
+    CORRIDOR_VMATRIX: _VariantLayer
+    OBSTACLES_VMATRIX: _ObjectVariantLayer
+    DECORATION_VMATRIX: _ObjectVariantLayer
     VMATRIX_PADDING: int
 
     UI_BACKGROUND_COLOR: tuple[int, int, int] = (150, 150, 150)
@@ -26,24 +27,24 @@ class Renderer:
              screen_size: tuple[int, int],
              tile_size: int,
              dungeon_grid: np.ndarray,
-             wall_vmatrix: np.ndarray,
-             room_vmatrix: np.ndarray,
-             corridor_vmatrix: np.ndarray,
-             obstacles_vmatrix: np.ndarray,
-             decoration_vmatrix: np.ndarray,
+             wall_vmatrix: _VariantLayer,
+             room_vmatrix: _VariantLayer,
+             corridor_vmatrix: _VariantLayer,
+             obstacles_vmatrix: _ObjectVariantLayer,
+             decoration_vmatrix: _ObjectVariantLayer,
              *args, **kwargs) -> None:
         '''Initializes the renderer with the given parameters.
 
-        This method sets up the renderer by initializing the screen, tile size, and various matrices used for rendering the dungeon.
+        This method sets up the renderer by initializing the screen, tile size, and the grid and variant layers used for rendering the dungeon.
 
         :param screen: The screen surface to render on.
         :param int tile_size: The size of each tile in pixels.
         :param np.ndarray dungeon_grid: The grid representing the dungeon layout.
-        :param np.ndarray wall_vmatrix: The matrix representing the walls.
-        :param np.ndarray room_vmatrix: The matrix representing the rooms.
-        :param np.ndarray corridor_vmatrix: The matrix representing the corridors.
-        :param np.ndarray obstacles_vmatrix: The matrix representing the obstacles.
-        :param np.ndarray decoration_vmatrix: The matrix representing the decorations.
+        :param _VariantLayer wall_vmatrix: The variant layer of the walls.
+        :param _VariantLayer room_vmatrix: The variant layer of the rooms.
+        :param _VariantLayer corridor_vmatrix: The variant layer of the corridors.
+        :param _ObjectVariantLayer obstacles_vmatrix: The variant layer of the obstacles.
+        :param _ObjectVariantLayer decoration_vmatrix: The variant layer of the decorations.
         :return: None
         '''
         cls.SCREEN = screen
@@ -53,21 +54,22 @@ class Renderer:
         cls.VMATRIX_PADDING = max(cls.SCREEN_SIZE)
 
         cls.DUNGEON_GRID = np.pad(dungeon_grid, (cls.VMATRIX_PADDING,), mode='constant', constant_values=0)
-        cls.WALL_VMATRIX = np.pad(wall_vmatrix, (cls.VMATRIX_PADDING,), mode='constant', constant_values=0)
-        cls.ROOM_VMATRIX = np.pad(room_vmatrix, (cls.VMATRIX_PADDING,), mode='constant', constant_values=0)
-        cls.CORRIDOR_VMATRIX = np.pad(corridor_vmatrix, (cls.VMATRIX_PADDING,), mode='constant', constant_values=0)
-        cls.OBSTACLES_VMATRIX = np.pad(obstacles_vmatrix, ([cls.VMATRIX_PADDING]*2, [cls.VMATRIX_PADDING]*2, [0]*2), mode='constant', constant_values=(None, None))
-        cls.DECORATION_VMATRIX = np.pad(decoration_vmatrix, ([cls.VMATRIX_PADDING]*2, [cls.VMATRIX_PADDING]*2, [0]*2), mode='constant', constant_values=(None, None))
+        cls.WALL_VMATRIX = wall_vmatrix
+        cls.ROOM_VMATRIX = room_vmatrix
+        cls.CORRIDOR_VMATRIX = corridor_vmatrix
+        cls.OBSTACLES_VMATRIX = obstacles_vmatrix
+        cls.DECORATION_VMATRIX = decoration_vmatrix
 
     
     @classmethod
-    def render_scene(cls, player_position: tuple[int, int]) -> None:
+    def render_scene(cls, player_position: tuple[int, int], dynamic_lights: list[Lighting.LightSource] = None) -> None:
         '''Renders the entire scene centered around the player's position.
 
         This method calculates the visible area of the dungeon grid based on the player's position and the screen size.
-        It then renders the tiles, obstacles, decorations, and entities within this visible area.
+        It then renders the tiles, obstacles, decorations, and entities within this visible area, and darkens them according to the lighting.
 
         :param tuple[int, int] player_position: The current position of the player in the dungeon grid.
+        :param list[Lighting.LightSource] dynamic_lights: The moving light sources, such as the player's, defaults to None.
         :return: None
         '''
         x_offset, y_offset = cls.SCREEN_SIZE[0] // 2, cls.SCREEN_SIZE[1] // 2
@@ -76,13 +78,19 @@ class Renderer:
             player_position[0] + cls.VMATRIX_PADDING - x_offset, player_position[0] + cls.VMATRIX_PADDING + x_offset+1,
             player_position[1] + cls.VMATRIX_PADDING - y_offset, player_position[1] + cls.VMATRIX_PADDING + y_offset+1
         )
+        # The variant layers are not padded, so they are indexed with the dungeon coordinates of the visible area
+        x1, x2 = player_position[0] - x_offset, player_position[0] + x_offset+1
+        y1, y2 = player_position[1] - y_offset, player_position[1] + y_offset+1
+
         rendered_tiles = cls.DUNGEON_GRID[splitter[0]:splitter[1], splitter[2]:splitter[3]]
-        rendered_obstacles = cls.OBSTACLES_VMATRIX[splitter[0]:splitter[1], splitter[2]:splitter[3]]
-        rendered_decoration = cls.DECORATION_VMATRIX[splitter[0]:splitter[1], splitter[2]:splitter[3]]
+        rendered_variants = np.where(rendered_tiles == 1, cls.ROOM_VMATRIX[x1:x2, y1:y2],
+                                     np.where(rendered_tiles == 2, cls.CORRIDOR_VMATRIX[x1:x2, y1:y2], cls.WALL_VMATRIX[x1:x2, y1:y2]))
+        rendered_obstacles = cls.OBSTACLES_VMATRIX[x1:x2, y1:y2]
+        rendered_decoration = cls.DECORATION_VMATRIX[x1:x2, y1:y2]
         for x in range(rendered_tiles.shape[0]):
             for y in range(rendered_tiles.shape[1]):
 
-                cls._render_tile(x, y, rendered_tiles, splitter)
+                cls._render_tile(x, y, rendered_tiles, rendered_variants)
 
                 has_rendered_an_obstacle = cls._render_obstacle(x, y, rendered_tiles, rendered_obstacles)
                 
@@ -91,9 +99,11 @@ class Renderer:
         
         cls._render_entities([GameLogic.PLAYER] + GameLogic.ENEMIES, splitter)
 
+        Lighting.render(cls.SCREEN, splitter, dynamic_lights)
+
 
     @classmethod
-    def _render_tile(cls, x: int, y: int, rendered_tiles: np.ndarray, splitter: tuple) -> None:
+    def _render_tile(cls, x: int, y: int, rendered_tiles: np.ndarray, rendered_variants: np.ndarray) -> None:
         '''Renders a single tile at the specified position.
 
         This method renders a tile at the given (x, y) position within the visible area of the dungeon grid.
@@ -101,14 +111,14 @@ class Renderer:
         :param int x: The x-coordinate of the tile.
         :param int y: The y-coordinate of the tile.
         :param np.ndarray rendered_tiles: The array of tiles to be rendered.
-        :param tuple splitter: The tuple defining the visible area of the dungeon grid.
+        :param np.ndarray rendered_variants: The array of texture variants of the tiles to be rendered.
         :return: None
         '''
-        texture, vmatrix = (GameSprites.tiles.ROOM, cls.ROOM_VMATRIX) if rendered_tiles[x, y] == 1 else \
-                                (GameSprites.tiles.CORRIDOR, cls.CORRIDOR_VMATRIX) if rendered_tiles[x, y] == 2 else \
-                                (GameSprites.tiles.WALL, cls.WALL_VMATRIX)
+        texture = GameSprites.tiles.ROOM if rendered_tiles[x, y] == 1 else \
+                    GameSprites.tiles.CORRIDOR if rendered_tiles[x, y] == 2 else \
+                    GameSprites.tiles.WALL
         cls.SCREEN.blit(
-            texture.get_variant(vmatrix[x + splitter[0], y + splitter[2]], cls.TILE_SIZE),
+            texture.get_variant(rendered_variants[x, y], cls.TILE_SIZE),
             (x * cls.TILE_SIZE, y * cls.TILE_SIZE)
         )
     
@@ -1,8 +1,17 @@
 import pygame
-import random
 import numpy as np
 
 
+_MASK_64 = 0xFFFFFFFFFFFFFFFF
+_GOLDEN_RATIO_64 = 0x9E3779B97F4A7C15
+
+def _splitmix64(h):
+    '''Finalizer of the SplitMix64 generator, works on python integers as well as numpy.uint64 arrays.'''
+    h = (h ^ (h >> 30)) * 0xBF58476D1CE4E5B9 & _MASK_64
+    h = (h ^ (h >> 27)) * 0x94D049BB133111EB & _MASK_64
+    return h ^ (h >> 31)
+
+
 class _Texture:
     def __init__(self, texture_filenames: list[str]) -> None:
         self.texture_images: list[pygame.Surface] = [
@@ -27,6 +36,67 @@ class _UI_Icon:
             return pygame.transform.scale(self.icon, size=(side_length, side_length))
 
 
+class _VariantLayer:
+    def __init__(self, variants: int, random_seed: int, layer: int) -> None:
+        self.variants = variants
+        self.random_seed = random_seed
+        self.layer = layer
+
+    def _hash(self, x, y):
+        '''Hashes (random_seed, layer, x, y) into a 64-bit integer.
+
+        :param x: The x-coordinate(s), either an integer or a numpy array of integers.
+        :param y: The y-coordinate(s), either an integer or a numpy array of integers broadcastable with x.
+        :return: The hash(es), as a python integer or a numpy.uint64 array.
+        '''
+        if isinstance(x, np.ndarray):
+            x, y = x.astype(np.int64).astype(np.uint64), y.astype(np.int64).astype(np.uint64)
+        else:
+            x, y = x & _MASK_64, y & _MASK_64
+        h = _splitmix64((self.random_seed * _GOLDEN_RATIO_64 + self.layer) & _MASK_64)
+        h = _splitmix64((h ^ x) * _GOLDEN_RATIO_64 & _MASK_64)
+        return _splitmix64((h ^ y) * _GOLDEN_RATIO_64 & _MASK_64)
+
+    def _values(self, h):
+        variant = (h >> 20 & 0xFFFFF) % self.variants
+        return variant.astype(np.int64) if isinstance(h, np.ndarray) else variant
+
+    def __getitem__(self, key: tuple):
+        '''Returns the variant of a tile, or the variants of a rectangle of tiles when both indices are slices.
+
+        Slices must have explicit bounds, as the layer has no size. Coordinates may be negative.
+        '''
+        x, y = key
+        if isinstance(x, slice):
+            xs, ys = np.ogrid[x.start:x.stop, y.start:y.stop]
+            return self._values(self._hash(xs, ys))
+        return self._values(self._hash(int(x), int(y)))
+
+
+class _ObjectVariantLayer(_VariantLayer):
+    def __init__(self, object_textures: list[_Texture], random_seed: int, layer: int, fill: float) -> None:
+        super().__init__(variants=1, random_seed=random_seed, layer=layer)
+        self.object_textures = object_textures
+        self.fill = fill
+
+    def _values(self, h):
+        filled = (h >> 40) < self.fill * (1 << 24)
+        obj_id = h & 0xFFFFF
+        variant = h >> 20 & 0xFFFFF
+        if not isinstance(h, np.ndarray):
+            if not filled:
+                return (None, None)
+            obj = self.object_textures[obj_id % len(self.object_textures)]
+            return (obj, variant % obj.variants)
+
+        obj_id = (obj_id % len(self.object_textures)).astype(np.int64)
+        variant = variant.astype(np.int64) % np.array([obj.variants for obj in self.object_textures])[obj_id]
+        values = np.full(shape=(*h.shape, 2), fill_value=None, dtype=object)
+        values[filled, 0] = np.array(self.object_textures, dtype=object)[obj_id[filled]]
+        values[filled, 1] = variant[filled]
+        return values
+
+
 
 class GameSprites:
   
@@ -77,42 +147,32 @@ class GameSprites:
 
 
     @classmethod
-    def variant_matrix(cls, size: tuple[int, int], variants: int, random_seed: int) -> np.ndarray:
-        '''Generates a matrix of texture variants.
+    def variant_layer(cls, variants: int, random_seed: int, layer: int) -> _VariantLayer:
+        '''Creates a layer of texture variants.
 
-        This method generates a matrix of random integers representing different texture variants based on the given size and number of variants.
+        The layer behaves like an unbounded, read-only matrix of integers representing different texture variants:
+        the variant of each tile is computed on demand from a hash of (random_seed, layer, x, y), so that no memory
+        is used per tile and the same seed always gives the same variants.
 
-        :param tuple[int, int] size: The size of the matrix to generate.
         :param int variants: The number of texture variants.
-        :param int random_seed: The seed for the random number generator.
-        :return np.ndarray: A matrix of random integers representing texture variants.
+        :param int random_seed: The seed of the hash.
+        :param int layer: The number of the layer, which must be different for each layer created with the same seed.
+        :return _VariantLayer: The layer, to be indexed as layer[x, y] or layer[x1:x2, y1:y2].
         '''
-        if variants > 1:
-            np.random.seed(random_seed)
-            return np.random.randint(low=0, high=variants, size=size, dtype=int)
-        else:
-            return np.zeros(shape=size, dtype=int)
+        return _VariantLayer(variants=variants, random_seed=random_seed, layer=layer)
 
 
     @classmethod
-    def object_variant_matrix(cls, size: tuple[int, int], object_textures: list[_Texture], random_seed: int, fill: float = 0.25) -> np.ndarray:
-        '''Generates a matrix of object texture variants.
+    def object_variant_layer(cls, object_textures: list[_Texture], random_seed: int, layer: int, fill: float = 0.25) -> _ObjectVariantLayer:
+        '''Creates a layer of object texture variants.
 
-        This method generates a matrix of object texture variants based on the given size, list of object textures, and fill percentage.
+        The layer behaves like an unbounded, read-only matrix in which each element is either (None, None) or a pair
+        (object texture, variant id), computed on demand from a hash of (random_seed, layer, x, y).
 
-        :param tuple[int, int] size: The size of the matrix to generate.
         :param list[_Texture] object_textures: The list of object textures.
-        :param int random_seed: The seed for the random number generator.
-        :param float fill: The fill percentage for the matrix.
-        :return np.ndarray: A matrix of object texture variants.
+        :param int random_seed: The seed of the hash.
+        :param int layer: The number of the layer, which must be different for each layer created with the same seed.
+        :param float fill: The proportion of tiles holding an object.
+        :return _ObjectVariantLayer: The layer, to be indexed as layer[x, y] or layer[x1:x2, y1:y2].
         '''
-        vmatrices = [cls.variant_matrix(size=size, variants=obj.variants, random_seed=random_seed) for obj in object_textures]
-        fill_matrix = np.random.rand(*size)
-        final_matrix = np.full(shape=(*size, 2), fill_value=(None, None))
-        for x in range(size[0]):
-            for y in range(size[1]):
-                if fill_matrix[x, y] <= fill:
-                    obj_id = random.randint(0, len(object_textures) - 1)
-                    final_matrix[x, y][0] = object_textures[obj_id]
-                    final_matrix[x, y][1] = vmatrices[obj_id][x, y]
-        return final_matrix
\ No newline at end of file
+        return _ObjectVariantLayer(object_textures=object_textures, random_seed=random_seed, layer=layer, fill=fill)
\ No newline at end of file
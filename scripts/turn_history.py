@@ -0,0 +1,183 @@
+import numpy as np
+
+from scripts.game_logic import GameLogic
+
+
+class TurnHistory:
+    CAPACITY: int
+    KEYFRAME_INTERVAL: int
+
+    first_turn: int # The oldest turn that can still be restored
+    latest_turn: int # The turn whose state matches the current state of the entities
+
+    _deltas: 'list[TurnHistory.Delta]'
+    _state: np.ndarray
+
+
+    class Delta:
+        def __init__(self, turn: int, indices: np.ndarray, before: np.ndarray, after: np.ndarray, keyframe: np.ndarray = None) -> None:
+            self.turn = turn
+            self.indices = indices
+            self.before = before
+            self.after = after
+            self.keyframe = keyframe
+
+        @property
+        def nbytes(self) -> int:
+            return self.indices.nbytes + self.before.nbytes + self.after.nbytes + (0 if self.keyframe is None else self.keyframe.nbytes)
+        def __repr__(self) -> str:
+            return f'Delta(turn={self.turn}, changes={len(self.indices)}, keyframe={self.keyframe is not None})'
+
+
+    @classmethod
+    def init(cls, capacity: int = 256, keyframe_interval: int = 32, *args, **kwargs) -> None:
+        '''Initializes an empty history.
+
+        :param int capacity: The number of turns that can be restored, defaults to 256.
+        :param int keyframe_interval: The number of turns between two full copies of the state of the entities, defaults to 32.
+        :return: None
+        '''
+        cls.CAPACITY = capacity
+        cls.KEYFRAME_INTERVAL = keyframe_interval
+        cls.clear()
+
+
+    @classmethod
+    def clear(cls) -> None:
+        '''Forgets every recorded turn.
+
+        :return: None
+        '''
+        cls._deltas = [None] * cls.CAPACITY
+        cls._state = None
+        cls.first_turn = cls.latest_turn = -1
+
+
+    @classmethod
+    def _entities(cls) -> 'list[GameLogic.Entity]':
+        return [GameLogic.PLAYER] + GameLogic.ENEMIES
+
+
+    @classmethod
+    def _capture(cls, entities: 'list[GameLogic.Entity]') -> np.ndarray:
+        '''Packs the state of the given entities into a matrix.
+
+        :param list[GameLogic.Entity] entities: The entities, the player being the first one.
+        :return np.ndarray: A matrix in which each row is (x-position, y-position, health, energy) of an entity.
+            Enemies have no energy, so theirs is always 0.
+        '''
+        state = np.empty(shape=(len(entities), 4), dtype=np.int32)
+        state[:, :2] = [e.position for e in entities]
+        state[:, 2] = [e.health for e in entities]
+        state[:, 3] = 0
+        state[0, 3] = GameLogic.PLAYER.energy
+        return state
+
+
+    @classmethod
+    def record(cls, turn: int) -> int:
+        '''Records the changes made to the entities since the previous turn.
+
+        Only the rows of the entities whose position, health or energy changed are stored,
+        along with a full copy of the state every KEYFRAME_INTERVAL turns.
+        When turn does not follow the latest recorded turn, or when the number of entities changed, the history starts over.
+
+        :param int turn: The number of the turn that just ended (See GameLogic.turn).
+        :return int: The memory, in bytes, used to record this turn.
+        '''
+        state = cls._capture(cls._entities())
+
+        if cls._state is None or state.shape != cls._state.shape or turn != cls.latest_turn + 1:
+            cls.clear()
+            cls.first_turn = turn
+            indices = np.empty(shape=0, dtype=np.int32)
+        else:
+            indices = np.flatnonzero(np.any(state != cls._state, axis=1)).astype(np.int32)
+
+        delta = cls.Delta(
+            turn=turn,
+            indices=indices,
+            before=np.empty(shape=(0, 4), dtype=np.int32) if cls._state is None else cls._state[indices],
+            after=state[indices],
+            keyframe=state.copy() if turn == cls.first_turn or turn % cls.KEYFRAME_INTERVAL == 0 else None
+        )
+        cls._deltas[turn % cls.CAPACITY] = delta
+        cls._state = state
+        cls.latest_turn = turn
+        cls.first_turn = max(cls.first_turn, turn - cls.CAPACITY + 1)
+        return delta.nbytes
+
+
+    @classmethod
+    def restore(cls, turn: int) -> None:
+        '''Puts every entity back in the state it was in at the end of the given turn, and forgets the turns that followed it.
+
+        The state is rebuilt either by undoing the changes of the turns that followed it, or by replaying the changes
+        made since the closest previous keyframe, whichever touches fewer entities.
+
+        :param int turn: The turn to restore, between TurnHistory.first_turn and TurnHistory.latest_turn.
+        :raises ValueError: If the turn is not in the history.
+        :return: None
+        '''
+        if not cls.first_turn <= turn <= cls.latest_turn:
+            raise ValueError(f'Turn {turn} is not in the history (turns {cls.first_turn} to {cls.latest_turn} can be restored)')
+
+        undone = [cls._deltas[t % cls.CAPACITY] for t in range(cls.latest_turn, turn, -1)]
+        keyframe_turn = turn
+        while cls._deltas[keyframe_turn % cls.CAPACITY].keyframe is None and keyframe_turn > cls.first_turn:
+            keyframe_turn -= 1
+        replayed = [cls._deltas[t % cls.CAPACITY] for t in range(keyframe_turn + 1, turn + 1)]
+
+        keyframe = cls._deltas[keyframe_turn % cls.CAPACITY].keyframe
+        undo_cost = sum(len(delta.indices) for delta in undone)
+        replay_cost = len(cls._state) + sum(len(delta.indices) for delta in replayed) if keyframe is not None else None
+
+        if replay_cost is not None and replay_cost < undo_cost:
+            state = keyframe.copy()
+            for delta in replayed:
+                state[delta.indices] = delta.after
+            changed = np.flatnonzero(np.any(state != cls._state, axis=1))
+        else:
+            state = cls._state
+            for delta in undone:
+                state[delta.indices] = delta.before
+            changed = np.unique(np.concatenate([delta.indices for delta in undone] + [np.empty(shape=0, dtype=np.int32)]))
+
+        entities = cls._entities()
+        for i in set(changed.tolist()) | {0}:
+            entities[i].position = (int(state[i, 0]), int(state[i, 1]))
+            entities[i]._health = int(state[i, 2])
+        GameLogic.PLAYER._energy = int(state[0, 3])
+
+        cls._state = state
+        cls.latest_turn = turn
+        GameLogic.turn = turn
+
+
+    @classmethod
+    def undo(cls, turns: int = 1) -> None:
+        '''Restores the state of the entities as it was a given number of turns ago, or as far back as the history goes.
+
+        :param int turns: The number of turns to undo, defaults to 1.
+        :return: None
+        '''
+        if cls.latest_turn > cls.first_turn:
+            cls.restore(max(cls.first_turn, cls.latest_turn - turns))
+
+
+    @classmethod
+    def memory_per_turn(cls) -> dict[int, int]:
+        '''Returns the memory used to record each turn that can be restored.
+
+        :return dict[int, int]: The number of bytes used by each turn, keys being the turn numbers.
+        '''
+        return {t: cls._deltas[t % cls.CAPACITY].nbytes for t in range(cls.first_turn, cls.latest_turn + 1)}
+
+
+    @classmethod
+    def memory_usage(cls) -> int:
+        '''Returns the memory used by the whole history.
+
+        :return int: The number of bytes used by the recorded turns and the current state.
+        '''
+        return sum(cls.memory_per_turn().values()) + (0 if cls._state is None else cls._state.nbytes)